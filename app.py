@@ -1,27 +1,216 @@
 import contextlib
+import io
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
 
 VERSION = "0.3.1"
 
+_MARKER_SYMBOLS: tuple[str, ...] = (
+    "arrow",
+    "arrow-bar-down",
+    "arrow-bar-down-open",
+    "arrow-bar-left",
+    "arrow-bar-left-open",
+    "arrow-bar-right",
+    "arrow-bar-right-open",
+    "arrow-bar-up",
+    "arrow-bar-up-open",
+    "arrow-down",
+    "arrow-down-open",
+    "arrow-left",
+    "arrow-left-open",
+    "arrow-open",
+    "arrow-right",
+    "arrow-right-open",
+    "arrow-up",
+    "arrow-up-open",
+    "arrow-wide",
+    "arrow-wide-open",
+    "asterisk",
+    "asterisk-open",
+    "bowtie",
+    "bowtie-open",
+    "circle",
+    "circle-cross",
+    "circle-cross-open",
+    "circle-dot",
+    "circle-open",
+    "circle-open-dot",
+    "circle-x",
+    "circle-x-open",
+    "cross",
+    "cross-dot",
+    "cross-open",
+    "cross-open-dot",
+    "cross-thin",
+    "cross-thin-open",
+    "diamond",
+    "diamond-cross",
+    "diamond-cross-open",
+    "diamond-dot",
+    "diamond-open",
+    "diamond-open-dot",
+    "diamond-tall",
+    "diamond-tall-dot",
+    "diamond-tall-open",
+    "diamond-tall-open-dot",
+    "diamond-wide",
+    "diamond-wide-dot",
+    "diamond-wide-open",
+    "diamond-wide-open-dot",
+    "diamond-x",
+    "diamond-x-open",
+    "hash",
+    "hash-dot",
+    "hash-open",
+    "hash-open-dot",
+    "hexagon",
+    "hexagon2",
+    "hexagon2-dot",
+    "hexagon2-open",
+    "hexagon2-open-dot",
+    "hexagon-dot",
+    "hexagon-open",
+    "hexagon-open-dot",
+    "hexagram",
+    "hexagram-dot",
+    "hexagram-open",
+    "hexagram-open-dot",
+    "hourglass",
+    "hourglass-open",
+    "line-ew",
+    "line-ew-open",
+    "line-ne",
+    "line-ne-open",
+    "line-ns",
+    "line-ns-open",
+    "line-nw",
+    "line-nw-open",
+    "octagon",
+    "octagon-dot",
+    "octagon-open",
+    "octagon-open-dot",
+    "pentagon",
+    "pentagon-dot",
+    "pentagon-open",
+    "pentagon-open-dot",
+    "square",
+    "square-cross",
+    "square-cross-open",
+    "square-dot",
+    "square-open",
+    "square-open-dot",
+    "square-x",
+    "square-x-open",
+    "star",
+    "star-diamond",
+    "star-diamond-dot",
+    "star-diamond-open",
+    "star-diamond-open-dot",
+    "star-dot",
+    "star-open",
+    "star-open-dot",
+    "star-square",
+    "star-square-dot",
+    "star-square-open",
+    "star-square-open-dot",
+    "star-triangle-down",
+    "star-triangle-down-dot",
+    "star-triangle-down-open",
+    "star-triangle-down-open-dot",
+    "star-triangle-up",
+    "star-triangle-up-dot",
+    "star-triangle-up-open",
+    "star-triangle-up-open-dot",
+    "triangle-down",
+    "triangle-down-dot",
+    "triangle-down-open",
+    "triangle-down-open-dot",
+    "triangle-left",
+    "triangle-left-dot",
+    "triangle-left-open",
+    "triangle-left-open-dot",
+    "triangle-ne",
+    "triangle-ne-dot",
+    "triangle-ne-open",
+    "triangle-ne-open-dot",
+    "triangle-nw",
+    "triangle-nw-dot",
+    "triangle-nw-open",
+    "triangle-nw-open-dot",
+    "triangle-right",
+    "triangle-right-dot",
+    "triangle-right-open",
+    "triangle-right-open-dot",
+    "triangle-se",
+    "triangle-se-dot",
+    "triangle-se-open",
+    "triangle-se-open-dot",
+    "triangle-sw",
+    "triangle-sw-dot",
+    "triangle-sw-open",
+    "triangle-sw-open-dot",
+    "triangle-up",
+    "triangle-up-dot",
+    "triangle-up-open",
+    "triangle-up-open-dot",
+    "x",
+    "x-dot",
+    "x-open",
+    "x-open-dot",
+    "x-thin",
+    "x-thin-open",
+    "y-down",
+    "y-down-open",
+    "y-left",
+    "y-left-open",
+    "y-right",
+    "y-right-open",
+    "y-up",
+    "y-up-open",
+)
+_LINE_DASHES: tuple[str, ...] = (
+    "solid",
+    "dot",
+    "dash",
+    "longdash",
+    "dashdot",
+    "longdashdot",
+)
+_LINE_SHAPES: tuple[str, ...] = ("linear", "spline")
+_DEFAULT_MODE = "lines+markers"
+_WEBGL_MIN_POINTS = 50
+_EMPTY_DF = pd.DataFrame(
+    {"Label": pd.Series(dtype="string"), "Value": pd.Series(dtype="float64")}
+)
+_OPTION_LABELS = {
+    "example": "Play with example data 💡",
+    "upload": "Upload an excel file ⬆️",
+    "manual": "Add data manually ✍️",
+}
+_MENU_ITEMS = {
+    "About": f"Polar Plotter v{VERSION}  "
+    f"\nApp contact: [Siddhant Sadangi](mailto:siddhant.sadangi@gmail.com)",
+    "Report a Bug": "https://github.com/SiddhantSadangi/PolarPlotter/issues/new",
+    "Get help": None,
+}
+
 st.set_page_config(
     page_title="Polar Plotter",
     page_icon="🕸️",
-    menu_items={
-        "About": f"Polar Plotter v{VERSION}  "
-        f"\nApp contact: [Siddhant Sadangi](mailto:siddhant.sadangi@gmail.com)",
-        "Report a Bug": "https://github.com/SiddhantSadangi/PolarPlotter/issues/new",
-        "Get help": None,
-    },
+    menu_items=_MENU_ITEMS,
     layout="centered",
 )
 
 
 # ---------- FUNCTIONS ----------
 def _reset() -> None:
-    st.session_state["title"] = ""
+    st.session_state["title"] = st.session_state["defaults"][
+        st.session_state["option"]
+    ]["title"]
     st.session_state["hovertemplate"] = "%{theta}: %{r}"
     st.session_state["opacity"] = st.session_state["marker_opacity"] = st.session_state[
         "line_smoothing"
@@ -38,75 +227,190 @@ def _reset() -> None:
     st.session_state["fill_opacity"] = 0.5
 
 
+@st.cache_data(show_spinner=False, max_entries=8, ttl="1h")
+def _load_upload(data: bytes, name: str) -> pd.DataFrame:
+    # Only the Label and Value columns are plotted
+    read_kwargs = dict(usecols=[0, 1], dtype={0: "string", 1: "float64"})
+    if name.rsplit(".", 1)[-1].lower() == "csv":
+        return pd.read_csv(io.BytesIO(data), **read_kwargs)
+    return pd.read_excel(io.BytesIO(data), **read_kwargs)
+
+
+@st.cache_data(show_spinner=False)
+def _example_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Skill": [
+                "Computer Vision",
+                "Prototyping",
+                "Classic ML",
+                "AE/VAE",
+                "Visualization",
+                "Storytelling",
+                "BI",
+                "SQL",
+                "Deploy",
+                "MLOps",
+                "Excel",
+                "Reporting",
+                "ViT",
+                "Diffusers",
+                "Python",
+                "NLP",
+            ],
+            "Proficiency": [
+                4.2,
+                4.7,
+                2.3,
+                4,
+                1.9,
+                2.4,
+                0.5,
+                0.6,
+                0.2,
+                0.3,
+                5,
+                1.6,
+                4,
+                2.4,
+                3.4,
+                3,
+            ],
+        }
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _sidebar_html(version: str) -> str:
+    with open("sidebar.html", "r", encoding="UTF-8") as sidebar_file:
+        return sidebar_file.read().replace("{VERSION}", version)
+
+
+@st.cache_resource(show_spinner=False)
+def _plotly_figure() -> type:
+    from plotly.graph_objects import Figure
+
+    # Resolve the polar trace classes and their validators once per process
+    # rather than on the first figure built by each session
+    Figure(data=[{"type": "scatterpolar"}, {"type": "scatterpolargl"}])
+    return Figure
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_fig(labels: tuple, values: tuple, **style) -> dict:
+    # To close the polygon. Indexing with [0] raises IndexError for empty data,
+    # and np.r_ is avoided because it parses string entries as directives
+    theta = np.asarray(labels)
+    r = np.asarray(values)
+    theta = np.concatenate((theta, theta[[0]]))[::-1]
+    r = np.concatenate((r, r[[0]]))[::-1]
+
+    if style["mode"] == ["lines", "markers"]:
+        mode = _DEFAULT_MODE
+    else:
+        mode = "+".join(style["mode"]) or "none"
+
+    trace = {
+        "type": "scatterpolar",
+        "r": r,
+        "theta": theta,
+        "mode": mode,
+        "opacity": style["opacity"],
+        "hovertemplate": style["hovertemplate"] + "<extra></extra>",
+        "marker": {
+            "color": style["marker_color"],
+            "opacity": style["marker_opacity"],
+            "size": style["marker_size"],
+            "symbol": style["marker_symbol"],
+        },
+        "line": {
+            "color": style["line_color"],
+            "dash": style["line_dash"],
+            "width": style["line_width"],
+        },
+        "fill": "toself",
+        "fillcolor": f"RGBA{style['rgba']}"
+        if style["rgba"]
+        else "RGBA(99, 110, 250, 0.5)",
+    }
+
+    # WebGL context creation outweighs SVG rendering for small traces, and
+    # scatterpolargl does not support spline lines
+    if len(values) < _WEBGL_MIN_POINTS or style["line_shape"] == "spline":
+        trace["line"]["shape"] = style["line_shape"]
+        trace["line"]["smoothing"] = style["line_smoothing"]
+    else:
+        trace["type"] = "scatterpolargl"
+
+    layout = {
+        "title": {"text": style["title"], "x": 0.5, "xanchor": "center"},
+        "paper_bgcolor": "rgba(100,100,100,0)",
+        "plot_bgcolor": "rgba(100,100,100,0)",
+    }
+
+    # All values come from the sidebar widgets and are already valid, so
+    # Plotly's per-attribute validation is skipped
+    Figure = _plotly_figure()
+    fig = Figure(data=[trace], layout=layout, _validate=False)
+
+    return fig.to_dict()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _fig_html(fig_dict: dict) -> bytes:
+    Figure = _plotly_figure()
+    fig = Figure(fig_dict, _validate=False)
+    return fig.to_html(include_plotlyjs="cdn").encode("utf-8")
+
+
+@st.cache_resource(show_spinner=False)
+def _save_as_png_image() -> bytes:
+    return Path("save_as_png.png").read_bytes()
+
+
 # ---------- HEADER ----------
 st.title("🕸️ Welcome to Polar Plotter!")
 st.subheader("Easily create rich polar/radar/spider plots.")
 
 
 # ---------- DATA ENTRY ----------
+if "defaults" not in st.session_state:
+    st.session_state["defaults"] = {
+        "example": {"title": "Job Requirements"},
+        "upload": {"title": ""},
+        "manual": {"title": ""},
+    }
+
 option = st.radio(
     label="Enter data",
-    options=(
-        "Play with example data 💡",
-        "Upload an excel file ⬆️",
-        "Add data manually ✍️",
-    ),
+    options=tuple(_OPTION_LABELS),
+    format_func=_OPTION_LABELS.get,
+    key="option",
     help="Uploaded files are deleted from the server when you\n* upload another file\n* clear the file uploader\n* close the browser tab",
 )
 
-if option == "Upload an excel file ⬆️":
+if option == "upload":
     if uploaded_file := st.file_uploader(
         label="Upload a file. File should have the format: Label|Value",
         type=["xlsx", "csv", "xls"],
     ):
-        input_df = pd.read_excel(uploaded_file)
-        st.dataframe(input_df, hide_index=True)
+        # pandas' ParserError is a ValueError, as are dtype conversion failures
+        try:
+            input_df = _load_upload(uploaded_file.getvalue(), uploaded_file.name)
+        except ValueError:
+            st.error(
+                "Could not read the file. It should have two columns in the format "
+                "Label|Value, with numeric values."
+            )
+        else:
+            st.dataframe(input_df, hide_index=True)
 
 else:
-    if option == "Add data manually ✍️":
-        _df = pd.DataFrame(columns=["Label", "Value"]).reset_index(drop=True)
+    if option == "manual":
+        _df = _EMPTY_DF.copy()
 
     else:
-        _df = pd.DataFrame(
-            {
-                "Skill": [
-                    "Computer Vision",
-                    "Prototyping",
-                    "Classic ML",
-                    "AE/VAE",
-                    "Visualization",
-                    "Storytelling",
-                    "BI",
-                    "SQL",
-                    "Deploy",
-                    "MLOps",
-                    "Excel",
-                    "Reporting",
-                    "ViT",
-                    "Diffusers",
-                    "Python",
-                    "NLP",
-                ],
-                "Proficiency": [
-                    4.2,
-                    4.7,
-                    2.3,
-                    4,
-                    1.9,
-                    2.4,
-                    0.5,
-                    0.6,
-                    0.2,
-                    0.3,
-                    5,
-                    1.6,
-                    4,
-                    2.4,
-                    3.4,
-                    3,
-                ],
-            }
-        )
+        _df = _example_df()
 
     input_df = st.data_editor(
         _df,
@@ -115,15 +419,15 @@ else:
     )
 
 # ---------- SIDEBAR ----------
-with open("sidebar.html", "r", encoding="UTF-8") as sidebar_file:
-    sidebar_html = sidebar_file.read().replace("{VERSION}", VERSION)
+sidebar_html = _sidebar_html(VERSION)
 
 ## ---------- Customization options ----------
-with st.sidebar:
-    with st.expander("Customization options"):
+def _style_controls(option: str) -> dict:
+    # Widgets are batched so that adjusting several knobs costs a single rerun
+    with st.form("style_form", border=False):
         title = st.text_input(
             label="Plot title",
-            value="Job Requirements" if option == "Play with example data 💡" else "",
+            value=st.session_state["defaults"][option]["title"],
             help="Sets the plot title.",
             key="title",
         )
@@ -195,170 +499,7 @@ with st.sidebar:
         marker_symbol = st.selectbox(
             label="Marker symbol",
             index=24,
-            options=[
-                "arrow",
-                "arrow-bar-down",
-                "arrow-bar-down-open",
-                "arrow-bar-left",
-                "arrow-bar-left-open",
-                "arrow-bar-right",
-                "arrow-bar-right-open",
-                "arrow-bar-up",
-                "arrow-bar-up-open",
-                "arrow-down",
-                "arrow-down-open",
-                "arrow-left",
-                "arrow-left-open",
-                "arrow-open",
-                "arrow-right",
-                "arrow-right-open",
-                "arrow-up",
-                "arrow-up-open",
-                "arrow-wide",
-                "arrow-wide-open",
-                "asterisk",
-                "asterisk-open",
-                "bowtie",
-                "bowtie-open",
-                "circle",
-                "circle-cross",
-                "circle-cross-open",
-                "circle-dot",
-                "circle-open",
-                "circle-open-dot",
-                "circle-x",
-                "circle-x-open",
-                "cross",
-                "cross-dot",
-                "cross-open",
-                "cross-open-dot",
-                "cross-thin",
-                "cross-thin-open",
-                "diamond",
-                "diamond-cross",
-                "diamond-cross-open",
-                "diamond-dot",
-                "diamond-open",
-                "diamond-open-dot",
-                "diamond-tall",
-                "diamond-tall-dot",
-                "diamond-tall-open",
-                "diamond-tall-open-dot",
-                "diamond-wide",
-                "diamond-wide-dot",
-                "diamond-wide-open",
-                "diamond-wide-open-dot",
-                "diamond-x",
-                "diamond-x-open",
-                "hash",
-                "hash-dot",
-                "hash-open",
-                "hash-open-dot",
-                "hexagon",
-                "hexagon2",
-                "hexagon2-dot",
-                "hexagon2-open",
-                "hexagon2-open-dot",
-                "hexagon-dot",
-                "hexagon-open",
-                "hexagon-open-dot",
-                "hexagram",
-                "hexagram-dot",
-                "hexagram-open",
-                "hexagram-open-dot",
-                "hourglass",
-                "hourglass-open",
-                "line-ew",
-                "line-ew-open",
-                "line-ne",
-                "line-ne-open",
-                "line-ns",
-                "line-ns-open",
-                "line-nw",
-                "line-nw-open",
-                "octagon",
-                "octagon-dot",
-                "octagon-open",
-                "octagon-open-dot",
-                "pentagon",
-                "pentagon-dot",
-                "pentagon-open",
-                "pentagon-open-dot",
-                "square",
-                "square-cross",
-                "square-cross-open",
-                "square-dot",
-                "square-open",
-                "square-open-dot",
-                "square-x",
-                "square-x-open",
-                "star",
-                "star-diamond",
-                "star-diamond-dot",
-                "star-diamond-open",
-                "star-diamond-open-dot",
-                "star-dot",
-                "star-open",
-                "star-open-dot",
-                "star-square",
-                "star-square-dot",
-                "star-square-open",
-                "star-square-open-dot",
-                "star-triangle-down",
-                "star-triangle-down-dot",
-                "star-triangle-down-open",
-                "star-triangle-down-open-dot",
-                "star-triangle-up",
-                "star-triangle-up-dot",
-                "star-triangle-up-open",
-                "star-triangle-up-open-dot",
-                "triangle-down",
-                "triangle-down-dot",
-                "triangle-down-open",
-                "triangle-down-open-dot",
-                "triangle-left",
-                "triangle-left-dot",
-                "triangle-left-open",
-                "triangle-left-open-dot",
-                "triangle-ne",
-                "triangle-ne-dot",
-                "triangle-ne-open",
-                "triangle-ne-open-dot",
-                "triangle-nw",
-                "triangle-nw-dot",
-                "triangle-nw-open",
-                "triangle-nw-open-dot",
-                "triangle-right",
-                "triangle-right-dot",
-                "triangle-right-open",
-                "triangle-right-open-dot",
-                "triangle-se",
-                "triangle-se-dot",
-                "triangle-se-open",
-                "triangle-se-open-dot",
-                "triangle-sw",
-                "triangle-sw-dot",
-                "triangle-sw-open",
-                "triangle-sw-open-dot",
-                "triangle-up",
-                "triangle-up-dot",
-                "triangle-up-open",
-                "triangle-up-open-dot",
-                "x",
-                "x-dot",
-                "x-open",
-                "x-open-dot",
-                "x-thin",
-                "x-thin-open",
-                "y-down",
-                "y-down-open",
-                "y-left",
-                "y-left-open",
-                "y-right",
-                "y-right-open",
-                "y-up",
-                "y-up-open",
-            ],
+            options=_MARKER_SYMBOLS,
             help="""Sets the marker symbol type. Adding 100 is equivalent to appending "-open" to a symbol name.
             Adding 200 is equivalent to appending "-dot" to a symbol name. Adding 300 is equivalent to appending "-open-dot" or "dot-open" to a symbol name.""",
             key="marker_symbol",
@@ -373,7 +514,7 @@ with st.sidebar:
 
         line_dash = st.selectbox(
             label="Line dash",
-            options=["solid", "dot", "dash", "longdash", "dashdot", "longdashdot"],
+            options=_LINE_DASHES,
             help="""Sets the dash style of lines.
             Set to a dash type string ("solid", "dot", "dash", "longdash", "dashdot", or "longdashdot") or a dash length list in px (eg "5px,10px,2px,2px").""",
             key="line_dash",
@@ -381,7 +522,7 @@ with st.sidebar:
 
         line_shape = st.selectbox(
             label="Line shape",
-            options=["linear", "spline"],
+            options=_LINE_SHAPES,
             help="""Determines the line shape. With "spline" the lines are drawn using spline interpolation.
             The other available values correspond to step-wise line shapes.""",
             key="line_shape",
@@ -426,35 +567,22 @@ with st.sidebar:
             key="fill_opacity",
         )
 
-        rgba = tuple(
-            (
-                [int(fillcolor.lstrip("#")[i : i + 2], 16) for i in (0, 2, 4)]
-                + [fill_opacity]
-            )
-        )
+        st.form_submit_button("Apply", use_container_width=True)
 
-        st.button(
-            "↩️ Reset to defaults",
-            on_click=_reset,
-            use_container_width=True,
-        )
+    rgb = int(fillcolor.lstrip("#"), 16)
+    rgba = (rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF, fill_opacity)
 
-    st.components.v1.html(sidebar_html, height=750)
+    st.button(
+        "↩️ Reset to defaults",
+        on_click=_reset,
+        use_container_width=True,
+    )
 
-# ---------- VISUALIZATION ----------
-with contextlib.suppress(IndexError, NameError):
-    labels = list(input_df[input_df.columns[0]])
-    # To close the polygon
-    values = list(input_df[input_df.columns[1]])
-    labels = (labels + [labels[0]])[::-1]
-    values = (values + [values[0]])[::-1]
-
-    data = go.Scatterpolar(
-        r=values,
-        theta=labels,
-        mode="none" if mode == [] else "+".join(mode),
+    return dict(
+        title=title,
         opacity=opacity,
-        hovertemplate=hovertemplate + "<extra></extra>",
+        mode=mode,
+        hovertemplate=hovertemplate,
         marker_color=marker_color,
         marker_opacity=marker_opacity,
         marker_size=marker_size,
@@ -464,21 +592,25 @@ with contextlib.suppress(IndexError, NameError):
         line_shape=line_shape,
         line_smoothing=line_smoothing,
         line_width=line_width,
-        fill="toself",
-        fillcolor=f"RGBA{rgba}" if rgba else "RGBA(99, 110, 250, 0.5)",
+        rgba=rgba,
     )
 
-    layout = go.Layout(
-        title=dict(
-            text="Job Requirements" if option == "Play with example data 💡" else title,
-            x=0.5,
-            xanchor="center",
-        ),
-        paper_bgcolor="rgba(100,100,100,0)",
-        plot_bgcolor="rgba(100,100,100,0)",
-    )
 
-    fig = go.Figure(data=data, layout=layout)
+with st.sidebar:
+    with st.expander("Customization options"):
+        style = _style_controls(option)
+
+    st.components.v1.html(sidebar_html, height=750)
+
+# ---------- VISUALIZATION ----------
+with contextlib.suppress(IndexError, NameError):
+    labels = tuple(input_df.iloc[:, 0].tolist())
+    values = tuple(input_df.iloc[:, 1].tolist())
+
+    fig_dict = _build_fig(labels, values, **style)
+    # st.plotly_chart revalidates plain dicts but takes Figure objects as-is
+    Figure = _plotly_figure()
+    fig = Figure(fig_dict, _validate=False)
 
     st.plotly_chart(
         fig,
@@ -492,13 +624,19 @@ with contextlib.suppress(IndexError, NameError):
     with lcol:
         with st.expander("💾Download static plot"):
             st.write("Download static image from the plot toolbar")
-            st.image("save_as_png.png")
+            st.image(_save_as_png_image())
 
-    fig.write_html("interactive.html")
-    with open("interactive.html", "rb") as file:
-        rcol.download_button(
+    with rcol:
+        # Rendering the HTML is only worth it once the user asks for it
+        if st.toggle(
             "💾Download interactive plot",
-            data=file,
-            mime="text/html",
-            use_container_width=True,
-        )
+            help="Prepares the plot as a standalone HTML file",
+            key="prepare_html",
+        ):
+            st.download_button(
+                "Download HTML",
+                data=_fig_html(fig_dict),
+                file_name="interactive.html",
+                mime="text/html",
+                use_container_width=True,
+            )